@@ -134,12 +134,15 @@ class WebAdminPanel:
             try:
                 query = request.args.get('q', '').strip()
                 limit = request.args.get('limit', 20, type=int)
+                agent = request.args.get('agent')
+                since = request.args.get('since', type=float)
                 
                 if not query:
                     return jsonify({'error': 'No search query provided'}), 400
                 
                 if 'memory' in self.components:
-                    entries = self.components['memory'].search_entries(query, limit)
+                    entries = self.components['memory'].search_entries(
+                        query, limit, agent=agent, since_ts=since)
                     return jsonify({'entries': entries, 'query': query})
                 else:
                     return jsonify({'error': 'Memory not available'}), 500
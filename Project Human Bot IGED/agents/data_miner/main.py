@@ -9,29 +9,20 @@ from typing import Dict, Any, Optional, List
 import json
 import csv
 
-# Try to import data analysis libraries
-try:
-    import pandas as pd
-    import numpy as np
-    import matplotlib.pyplot as plt
-    import seaborn as sns
-    DATA_LIBS_AVAILABLE = True
-except ImportError as e:
-    logger.warning(f"⚠️ Data analysis libraries not available: {e}")
-    DATA_LIBS_AVAILABLE = False
-    # Create dummy classes for type hints
-    class pd:
-        class DataFrame:
-            pass
-    class np:
-        pass
-    class plt:
-        pass
-    class sns:
-        pass
+from core.lazy import is_available, lazy_import
+
+# Data analysis libraries are imported on first use, not when the agent loads
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+plt = lazy_import("matplotlib.pyplot")
+sns = lazy_import("seaborn")
+DATA_LIBS_AVAILABLE = all(is_available(name) for name in ("pandas", "numpy", "matplotlib", "seaborn"))
 
 logger = logging.getLogger(__name__)
 
+if not DATA_LIBS_AVAILABLE:
+    logger.warning("⚠️ Data analysis libraries not available")
+
 class DataMinerAgent:
     def __init__(self, memory_engine):
         self.memory = memory_engine
@@ -285,7 +276,7 @@ class DataMinerAgent:
             logger.error(f"❌ General data processing failed: {e}")
             return f"❌ General data processing error: {str(e)}"
     
-    def _load_data(self, file_path: str) -> Optional[pd.DataFrame]:
+    def _load_data(self, file_path: str) -> Optional['pd.DataFrame']:
         """Load data from various file formats"""
         try:
             path_obj = Path(file_path)
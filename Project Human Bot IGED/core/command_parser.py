@@ -4,11 +4,18 @@ Converts natural language to structured commands
 """
 
 import re
+import time
 import logging
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
 
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=2)
+def _format_second(seconds: int) -> str:
+    """Format a whole epoch second as a local ISO 8601 date and time"""
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(seconds))
+
 class CommandParser:
     def __init__(self):
         self.command_patterns = {
@@ -56,6 +63,38 @@ class CommandParser:
             'hostname': r'(?:scan|check|test)\s+(?:the\s+)?([a-zA-Z0-9.-]+)',
             'target': r'(?:for|on|at)\s+([a-zA-Z0-9._-]+)'
         }
+        
+        self.boolean_flags = {
+            'verbose': r'\b(?:verbose|detailed|full)\b',
+            'quiet': r'\b(?:quiet|silent|minimal)\b',
+            'force': r'\b(?:force|overwrite)\b',
+            'recursive': r'\b(?:recursive|recursively)\b'
+        }
+        
+        self.numeric_patterns = {
+            'timeout': r'(?:timeout|time)\s+(\d+)',
+            'limit': r'(?:limit|max|maximum)\s+(\d+)',
+            'port': r'(?:port)\s+(\d+)'
+        }
+        
+        self.specific_keywords = ('generate', 'create', 'scan', 'analyze', 'process')
+        
+        # Compile command patterns once instead of per search
+        self._compiled_command_patterns = {
+            agent: [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+            for agent, patterns in self.command_patterns.items()
+        }
+        
+        # Compile parameter patterns once; these run on every command
+        self._compiled_parameter_patterns = {
+            name: re.compile(pattern) for name, pattern in self.parameter_patterns.items()
+        }
+        self._compiled_boolean_flags = {
+            flag: re.compile(pattern, re.IGNORECASE) for flag, pattern in self.boolean_flags.items()
+        }
+        self._compiled_numeric_patterns = {
+            param: re.compile(pattern, re.IGNORECASE) for param, pattern in self.numeric_patterns.items()
+        }
     
     def parse_command(self, text: str) -> Dict[str, Any]:
         """Parse natural language command into structured format"""
@@ -80,7 +119,7 @@ class CommandParser:
                 'agent': agent,
                 'target': target,
                 'parameters': parameters,
-                'confidence': self._calculate_confidence(text, command_type),
+                'confidence': self._calculate_confidence(text.lower(), command_type, parameters, len(text.split())),
                 'timestamp': self._get_timestamp()
             }
             
@@ -96,9 +135,9 @@ class CommandParser:
         text_lower = text.lower()
         
         # Check each agent's patterns
-        for agent, patterns in self.command_patterns.items():
+        for agent, patterns in self._compiled_command_patterns.items():
             for pattern in patterns:
-                if re.search(pattern, text_lower, re.IGNORECASE):
+                if pattern.search(text_lower):
                     command_type = self._get_command_type(text_lower, agent)
                     return command_type, agent
         
@@ -218,71 +257,49 @@ class CommandParser:
     def _extract_parameters(self, text: str) -> Dict[str, Any]:
         """Extract parameters from command text"""
         parameters = {}
+        patterns = self._compiled_parameter_patterns
         
         # Extract file paths
-        file_matches = re.findall(self.parameter_patterns['file_path'], text)
+        file_matches = patterns['file_path'].findall(text)
         if file_matches:
             parameters['files'] = file_matches
         
         # Extract URLs
-        url_matches = re.findall(self.parameter_patterns['url'], text)
+        url_matches = patterns['url'].findall(text)
         if url_matches:
             parameters['urls'] = url_matches
         
         # Extract IP addresses
-        ip_matches = re.findall(self.parameter_patterns['ip_address'], text)
+        ip_matches = patterns['ip_address'].findall(text)
         if ip_matches:
             parameters['ip_addresses'] = ip_matches
         
         # Extract boolean flags
-        boolean_flags = {
-            'verbose': r'\b(?:verbose|detailed|full)\b',
-            'quiet': r'\b(?:quiet|silent|minimal)\b',
-            'force': r'\b(?:force|overwrite)\b',
-            'recursive': r'\b(?:recursive|recursively)\b'
-        }
-        
-        for flag, pattern in boolean_flags.items():
-            if re.search(pattern, text, re.IGNORECASE):
+        for flag, pattern in self._compiled_boolean_flags.items():
+            if pattern.search(text):
                 parameters[flag] = True
         
         # Extract numeric values
-        numeric_patterns = {
-            'timeout': r'(?:timeout|time)\s+(\d+)',
-            'limit': r'(?:limit|max|maximum)\s+(\d+)',
-            'port': r'(?:port)\s+(\d+)'
-        }
-        
-        for param, pattern in numeric_patterns.items():
-            match = re.search(pattern, text, re.IGNORECASE)
+        for param, pattern in self._compiled_numeric_patterns.items():
+            match = pattern.search(text)
             if match:
                 parameters[param] = int(match.group(1))
         
         return parameters
     
-    def _calculate_confidence(self, text: str, command_type: str) -> float:
+    def _calculate_confidence(self, text_lower: str, command_type: str,
+                              parameters: Dict[str, Any], word_count: int) -> float:
         """Calculate confidence score for command parsing"""
-        confidence = 0.5  # Base confidence
-        
-        # Increase confidence for longer, more specific commands
-        if len(text.split()) > 3:
-            confidence += 0.2
-        
-        # Increase confidence for specific keywords
-        specific_keywords = ['generate', 'create', 'scan', 'analyze', 'process']
-        if any(keyword in text.lower() for keyword in specific_keywords):
-            confidence += 0.2
-        
-        # Increase confidence for file paths or URLs
-        if re.search(self.parameter_patterns['file_path'], text) or re.search(self.parameter_patterns['url'], text):
-            confidence += 0.1
-        
-        return min(confidence, 1.0)
+        # Base confidence, raised for longer commands, specific keywords,
+        # and file paths or URLs already found by _extract_parameters
+        specific = any(keyword in text_lower for keyword in self.specific_keywords)
+        has_target = bool(parameters.get('files') or parameters.get('urls'))
+        return 0.5 + 0.2 * (word_count > 3) + 0.2 * specific + 0.1 * has_target
     
     def _get_timestamp(self) -> str:
         """Get current timestamp"""
-        from datetime import datetime
-        return datetime.now().isoformat()
+        seconds, nanoseconds = divmod(time.time_ns(), 1_000_000_000)
+        return f"{_format_second(seconds)}.{nanoseconds // 1000:06d}"
     
     def _create_error_command(self, error_message: str) -> Dict[str, Any]:
         """Create error command structure"""
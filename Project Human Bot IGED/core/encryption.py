@@ -4,6 +4,7 @@ Handles AES-256 encryption for sensitive data
 """
 
 import os
+import json
 import base64
 import logging
 from pathlib import Path
@@ -14,8 +15,21 @@ from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.backends import default_backend
 
+# Try to import orjson for faster serialization
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Every Fernet token starts with the version byte 0x80 and a zero-led timestamp
+FERNET_TOKEN_PREFIX = b'gA'
+
+# Overwrite buffer size for secure_delete
+WIPE_CHUNK_SIZE = 1 << 20
+
 class EncryptionManager:
     def __init__(self, key_path: str = "config/secret.key"):
         self.key_path = Path(key_path)
@@ -73,46 +87,21 @@ class EncryptionManager:
     
     def encrypt(self, data: Union[str, bytes]) -> str:
         """Encrypt data using AES-256"""
-        try:
-            if not self.cipher:
-                raise ValueError("Encryption not initialized")
-            
-            # Convert string to bytes if necessary
-            if isinstance(data, str):
-                data = data.encode('utf-8')
-            
-            # Encrypt using Fernet
-            encrypted_data = self.cipher.encrypt(data)
-            
-            # Return base64 encoded string
-            return base64.b64encode(encrypted_data).decode('utf-8')
-            
-        except Exception as e:
-            logger.error(f"❌ Encryption failed: {e}")
-            raise
+        # The cipher is guaranteed by __init__; errors propagate to the caller
+        data = data.encode('utf-8') if type(data) is str else data
+        
+        # Fernet tokens are already URL-safe base64
+        return self.cipher.encrypt(data).decode('ascii')
     
     def decrypt(self, encrypted_data: Union[str, bytes]) -> str:
         """Decrypt data using AES-256"""
-        try:
-            if not self.cipher:
-                raise ValueError("Encryption not initialized")
-            
-            # Convert string to bytes if necessary
-            if isinstance(encrypted_data, str):
-                encrypted_data = encrypted_data.encode('utf-8')
-            
-            # Decode base64
-            encrypted_bytes = base64.b64decode(encrypted_data)
-            
-            # Decrypt using Fernet
-            decrypted_data = self.cipher.decrypt(encrypted_bytes)
-            
-            # Return as string
-            return decrypted_data.decode('utf-8')
-            
-        except Exception as e:
-            logger.error(f"❌ Decryption failed: {e}")
-            raise
+        token = encrypted_data.encode('ascii') if type(encrypted_data) is str else encrypted_data
+        
+        # Data written by older versions wrapped the token in another base64 layer
+        if not token.startswith(FERNET_TOKEN_PREFIX):
+            token = base64.b64decode(token)
+        
+        return self.cipher.decrypt(token).decode('utf-8')
     
     def encrypt_file(self, file_path: str, output_path: Optional[str] = None) -> str:
         """Encrypt a file"""
@@ -179,25 +168,16 @@ class EncryptionManager:
     
     def encrypt_dict(self, data: dict) -> str:
         """Encrypt a dictionary"""
-        try:
-            import json
-            json_data = json.dumps(data, ensure_ascii=False)
-            return self.encrypt(json_data)
-            
-        except Exception as e:
-            logger.error(f"❌ Dictionary encryption failed: {e}")
-            raise
+        if ORJSON_AVAILABLE:
+            return self.encrypt(orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS))
+        return self.encrypt(json.dumps(data, ensure_ascii=False))
     
     def decrypt_dict(self, encrypted_data: str) -> dict:
         """Decrypt a dictionary"""
-        try:
-            import json
-            json_data = self.decrypt(encrypted_data)
-            return json.loads(json_data)
-            
-        except Exception as e:
-            logger.error(f"❌ Dictionary decryption failed: {e}")
-            raise
+        json_data = self.decrypt(encrypted_data)
+        if ORJSON_AVAILABLE:
+            return orjson.loads(json_data)
+        return json.loads(json_data)
     
     def generate_password_hash(self, password: str, salt: Optional[bytes] = None) -> tuple:
         """Generate password hash using PBKDF2"""
@@ -252,13 +232,17 @@ class EncryptionManager:
             
             file_size = path_obj.stat().st_size
             
-            # Overwrite file multiple times
-            for _ in range(passes):
-                with open(path_obj, 'wb') as f:
-                    # Write random data
-                    f.write(os.urandom(file_size))
-                    f.flush()
-                    os.fsync(f.fileno())
+            # Overwrite file multiple times in place, one chunk at a time
+            fd = os.open(path_obj, os.O_WRONLY | getattr(os, 'O_BINARY', 0))
+            try:
+                for _ in range(passes):
+                    os.lseek(fd, 0, os.SEEK_SET)
+                    remaining = file_size
+                    while remaining:
+                        remaining -= os.write(fd, os.urandom(min(remaining, WIPE_CHUNK_SIZE)))
+                    os.fsync(fd)
+            finally:
+                os.close(fd)
             
             # Delete file
             path_obj.unlink()
@@ -0,0 +1,49 @@
+"""
+Lazy imports for IGED
+Defers loading heavy optional libraries until they are first used
+"""
+
+import importlib
+import importlib.util
+from functools import lru_cache
+from typing import Any
+
+class _LazyImport:
+    """Stand-in for a module or module attribute that imports it on first use"""
+    
+    def __init__(self, path: str):
+        self._path = path
+        self._target = None
+    
+    def _resolve(self) -> Any:
+        """Import the module, or the attribute for paths like "math.sqrt" """
+        target = self._target
+        if target is None:
+            try:
+                target = importlib.import_module(self._path)
+            except ModuleNotFoundError as e:
+                module_name, _, attr = self._path.rpartition('.')
+                if not module_name or e.name != self._path:
+                    raise
+                target = getattr(importlib.import_module(module_name), attr)
+            self._target = target
+        return target
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._resolve(), name)
+    
+    def __call__(self, *args, **kwargs) -> Any:
+        return self._resolve()(*args, **kwargs)
+    
+    def __repr__(self) -> str:
+        state = "loaded" if self._target is not None else "not loaded"
+        return f"<lazy import '{self._path}' ({state})>"
+
+def lazy_import(path: str) -> Any:
+    """Get a proxy that imports a module or module attribute when first used"""
+    return _LazyImport(path)
+
+@lru_cache(maxsize=None)
+def is_available(module_name: str) -> bool:
+    """Check whether a top-level module is installed without importing it"""
+    return importlib.util.find_spec(module_name) is not None
@@ -3,49 +3,368 @@ Memory Engine for IGED
 Handles persistent encrypted storage of commands and results
 """
 
+import atexit
 import json
+import queue
+from bisect import bisect_right
+from collections import Counter
+from collections.abc import Hashable
+from itertools import count, islice
+import os
+import threading
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, Union
 import logging
 
+# Try to import orjson for faster serialization
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Separates entries in the search blob; never produced by lowercasing text
+SEARCH_SEPARATOR = '\x01'
+
+# Size in characters at which the newest part of the search blob is sealed,
+# so a write only rejoins the text added since the last sealed segment
+SEARCH_SEGMENT_CHARS = 1 << 20
+
+# Records appended since the last rewrite after which the memory log is
+# rewritten in full
+COMPACT_EVERY = 500
+
+# Seconds the interpreter waits at exit for queued writes to reach disk
+EXIT_FLUSH_TIMEOUT = 10
+
 class MemoryEngine:
     def __init__(self, encryption_manager):
         self.encryption = encryption_manager
-        self.memory_file = Path("memory/memory_log.json")
+        self.memory_file = Path("memory/memory_log.jsonl")
+        self.legacy_memory_file = Path("memory/memory_log.json")
         self.memory_file.parent.mkdir(parents=True, exist_ok=True)
-        self.memory_data = self.load_memory()
+        self._log = None
+        self._log_records = 0
+        self._rewrite_on_start = False
+        self._legacy_loaded = False
+        self._id_counter = count()
+        
+        # Entries keyed by id, in insertion order
+        self.memory_data: Dict[str, Dict[str, Any]] = self.load_memory()
+        self._search_text: List[str] = []
+        self._search_entries: List[Optional[Dict[str, Any]]] = []
+        self._offsets: List[int] = []
+        self._positions: Dict[str, int] = {}
+        self._deleted_count = 0
+        self._segments: List[str] = []
+        self._segment_starts: List[int] = []
+        self._tail: Tuple[int, int, str] = (0, 0, '')
+        # Searches run concurrently (web admin, GUI) with writes; every index
+        # change and every search snapshot happens under this lock
+        self._search_lock = threading.RLock()
+        # Entries per agent keyed by id, in insertion order
+        self._by_agent: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._success_count = 0
+        self._agent_counts: Counter = Counter()
+        self._rebuild_index()
+        
+        # Saves run on a background writer so callers never block on disk I/O
+        self._save_lock = threading.Lock()
+        self._write_queue = queue.SimpleQueue()
+        self._writer_thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer_thread.start()
+        # The writer is a daemon thread, so make sure queued entries are
+        # written however the interpreter exits
+        atexit.register(self.flush, EXIT_FLUSH_TIMEOUT)
+        
+        # Move data from the old single-token file into the log, or start a
+        # clean log before anything is appended after a damaged one
+        if self._rewrite_on_start:
+            self._schedule_save()
+    
+    @staticmethod
+    def _dumps(data: Any, indent: bool = False) -> bytes:
+        """Serialize data to UTF-8 JSON bytes; indented output ends with a newline"""
+        if ORJSON_AVAILABLE:
+            option = orjson.OPT_NON_STR_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE
+            return orjson.dumps(data, option=option)
+        if indent:
+            return (json.dumps(data, indent=2, ensure_ascii=False) + '\n').encode('utf-8')
+        return json.dumps(data, ensure_ascii=False).encode('utf-8')
+    
+    @staticmethod
+    def _loads(data: Union[str, bytes]) -> Any:
+        """Deserialize JSON from str or bytes"""
+        if ORJSON_AVAILABLE:
+            return orjson.loads(data)
+        return json.loads(data)
+    
+    def _keyed(self, entries: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Key entries by id, giving an id to any entry without one"""
+        keyed = {}
+        for entry in entries:
+            if 'id' not in entry:
+                entry['id'] = self.generate_id()
+            keyed[entry['id']] = entry
+        return keyed
+    
+    def _index_entry(self, entry: Dict[str, Any]):
+        """Add an entry to the agent and search indexes"""
+        # Lowercased once here instead of on every search; kept beside the
+        # entry so it never ends up in saved or exported data
+        search_text = (str(entry.get('command') or '') + '\x00' + str(entry.get('result') or '')).lower()
+        
+        with self._search_lock:
+            self._by_agent.setdefault(entry.get('agent'), {})[entry['id']] = entry
+            
+            # Running totals for get_statistics
+            if entry.get('success', False):
+                self._success_count += 1
+            self._agent_counts[entry.get('agent', 'unknown')] += 1
+            
+            if self._offsets:
+                offset = self._offsets[-1] + len(self._search_text[-1]) + len(SEARCH_SEPARATOR)
+            else:
+                offset = 0
+            self._positions[entry['id']] = len(self._search_entries)
+            self._search_text.append(search_text)
+            self._search_entries.append(entry)
+            self._offsets.append(offset)
+    
+    def _unindex_entry(self, entry: Dict[str, Any]):
+        """Remove an entry from the agent and search indexes"""
+        with self._search_lock:
+            self._by_agent[entry.get('agent')].pop(entry['id'], None)
+            
+            if entry.get('success', False):
+                self._success_count -= 1
+            agent = entry.get('agent', 'unknown')
+            self._agent_counts[agent] -= 1
+            if not self._agent_counts[agent]:
+                del self._agent_counts[agent]
+            
+            # The search text stays in the blob and searches skip it until
+            # deleted entries outnumber live ones
+            self._search_entries[self._positions.pop(entry['id'])] = None
+            self._deleted_count += 1
+            if self._deleted_count > len(self.memory_data):
+                self._rebuild_index()
+    
+    def _rebuild_index(self):
+        """Rebuild all indexes from memory data"""
+        with self._search_lock:
+            # Fresh lists, so a search holding the old ones stays consistent
+            self._search_text = []
+            self._search_entries = []
+            self._offsets = []
+            self._positions = {}
+            self._deleted_count = 0
+            self._segments = []
+            self._segment_starts = []
+            self._tail = (0, 0, '')
+            self._by_agent = {}
+            self._success_count = 0
+            self._agent_counts = Counter()
+            for entry in list(self.memory_data.values()):
+                self._index_entry(entry)
+    
+    def _get_search_segments(self) -> List[Tuple[int, str]]:
+        """Get the search blob as (first entry position, joined text) segments"""
+        with self._search_lock:
+            # The tail covers entries start..end-1 that are not in a sealed segment
+            start, end, tail = self._tail
+            count = len(self._search_text)
+            if end != count:
+                tail = SEARCH_SEPARATOR.join(self._search_text[start:count])
+                if len(tail) >= SEARCH_SEGMENT_CHARS:
+                    self._segments.append(tail)
+                    self._segment_starts.append(start)
+                    start, tail = count, ''
+                self._tail = (start, count, tail)
+            
+            segments = list(zip(self._segment_starts, self._segments))
+        if start < count:
+            segments.append((start, tail))
+        return segments
+    
+    def _encode_record(self, record: Dict[str, Any]) -> bytes:
+        """Encrypt a record into one line of the memory log"""
+        return self.encryption.encrypt(self._dumps(record)).encode('ascii') + b'\n'
+    
+    def _decode_record(self, line: str) -> Dict[str, Any]:
+        """Decrypt one line of the memory log"""
+        try:
+            return self._loads(self.encryption.decrypt(line))
+        except Exception:
+            # If decryption fails, try as plain JSON
+            return self._loads(line)
+    
+    def _schedule_save(self):
+        """Queue a full rewrite of the memory log for the background writer"""
+        self._write_queue.put(None)
+    
+    def _writer_loop(self):
+        """Write memory in the background, one write per burst of changes"""
+        while True:
+            items = [self._write_queue.get()]
+            try:
+                while True:
+                    items.append(self._write_queue.get_nowait())
+            except queue.Empty:
+                pass
+            
+            compact = False
+            records = []
+            events = []
+            for item in items:
+                if item is None:
+                    compact = True
+                elif isinstance(item, threading.Event):
+                    events.append(item)
+                else:
+                    records.append(item)
+            
+            # A rewrite already contains every queued record
+            if compact or self._log_records + len(records) >= COMPACT_EVERY:
+                self.save_memory()
+            elif records:
+                self._append_records(records)
+            
+            # Wake up flush() callers waiting on this batch
+            for event in events:
+                event.set()
+    
+    def _append_records(self, records: List[Dict[str, Any]]):
+        """Append records to the memory log"""
+        try:
+            with self._save_lock:
+                if self._log is None:
+                    self._log = open(self.memory_file, 'ab', buffering=0)
+                self._log.write(b''.join(self._encode_record(record) for record in records))
+                self._log_records += len(records)
+            
+            logger.debug(f"💾 Appended {len(records)} memory records")
+            
+        except Exception as e:
+            logger.error(f"❌ Failed to save memory: {e}")
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until all queued saves are written"""
+        done = threading.Event()
+        self._write_queue.put(done)
+        return done.wait(timeout)
     
-    def load_memory(self) -> List[Dict[str, Any]]:
-        """Load memory from encrypted file"""
+    def compact(self):
+        """Queue a rewrite of the memory log without deleted records"""
+        self._schedule_save()
+    
+    def load_memory(self) -> Dict[str, Dict[str, Any]]:
+        """Load memory from the encrypted log"""
         try:
-            if self.memory_file.exists():
-                with open(self.memory_file, 'r', encoding='utf-8') as f:
-                    data = f.read()
-                    if data.strip():
-                        # Try to decrypt if encrypted
-                        try:
-                            decrypted = self.encryption.decrypt(data)
-                            return json.loads(decrypted)
-                        except:
-                            # If decryption fails, try as plain JSON
-                            return json.loads(data)
-            return []
+            if not self.memory_file.exists():
+                return self._load_legacy_memory()
+            
+            with open(self.memory_file, 'r', encoding='utf-8') as f:
+                lines = f.read().split('\n')
+            
+            # Every record ends with a newline, so text after the last one is
+            # a write cut short by a crash; it must be dropped before anything
+            # is appended after it
+            partial = lines.pop()
+            if partial.strip():
+                logger.warning("⚠️ Dropping incomplete last memory record")
+                self._rewrite_on_start = True
+            
+            # Later records win: a repeated id keeps its first position and a
+            # delete record drops the entry
+            entries: Dict[str, Dict[str, Any]] = {}
+            record_count = 0
+            unreadable = 0
+            for line in lines:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = self._decode_record(line)
+                except Exception:
+                    unreadable += 1
+                    continue
+                
+                record_count += 1
+                if record.get('op') == 'delete':
+                    entries.pop(record.get('id'), None)
+                else:
+                    entries.update(self._keyed([record]))
+            
+            # Complete records that cannot be read (wrong key, damaged file)
+            # are kept aside untouched; the readable ones start a new log
+            if unreadable:
+                corrupt_file = self.memory_file.with_name(
+                    f"{self.memory_file.name}.{time.time_ns()}.corrupt")
+                os.replace(self.memory_file, corrupt_file)
+                logger.error(f"❌ {unreadable} unreadable memory records, "
+                             f"original log kept as: {corrupt_file}")
+                self._rewrite_on_start = True
+            
+            # Records a rewrite would drop count towards the next one
+            self._log_records = record_count - len(entries)
+            return entries
         except Exception as e:
             logger.error(f"❌ Failed to load memory: {e}")
-            return []
+            # Never replace a log that could not be loaded with an empty one
+            self._rewrite_on_start = False
+            return {}
+    
+    def _load_legacy_memory(self) -> Dict[str, Dict[str, Any]]:
+        """Load memory saved by older versions as a single encrypted JSON list"""
+        if not self.legacy_memory_file.exists():
+            return {}
+        
+        entries = {}
+        with open(self.legacy_memory_file, 'r', encoding='utf-8') as f:
+            data = f.read()
+            if data.strip():
+                # Try to decrypt if encrypted
+                try:
+                    decrypted = self.encryption.decrypt(data)
+                    entries = self._keyed(self._loads(decrypted))
+                except:
+                    # If decryption fails, try as plain JSON
+                    entries = self._keyed(self._loads(data))
+        
+        # Only a file that parsed is replaced by the log
+        self._rewrite_on_start = True
+        self._legacy_loaded = True
+        return entries
     
     def save_memory(self):
-        """Save memory to encrypted file"""
+        """Rewrite the memory log with one record per current entry"""
         try:
-            data = json.dumps(self.memory_data, indent=2, ensure_ascii=False)
-            encrypted_data = self.encryption.encrypt(data)
-            
-            with open(self.memory_file, 'w', encoding='utf-8') as f:
-                f.write(encrypted_data)
+            with self._save_lock:
+                data = b''.join(self._encode_record(entry) for entry in list(self.memory_data.values()))
+                
+                # Write a new file and swap it in so a crash never leaves a
+                # half-written log behind
+                temp_file = self.memory_file.with_name(self.memory_file.name + '.tmp')
+                with open(temp_file, 'wb') as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                
+                if self._log is not None:
+                    self._log.close()
+                    self._log = None
+                os.replace(temp_file, self.memory_file)
+                self._log_records = 0
+                
+                if self._legacy_loaded and self.legacy_memory_file.exists():
+                    self.legacy_memory_file.unlink()
             
             logger.debug("💾 Memory saved successfully")
             
@@ -66,8 +385,9 @@ class MemoryEngine:
                 "metadata": metadata or {}
             }
             
-            self.memory_data.append(entry)
-            self.save_memory()
+            self.memory_data[entry['id']] = entry
+            self._index_entry(entry)
+            self._write_queue.put(entry)
             
             logger.info(f"📝 Added memory entry: {entry['id']}")
             return entry['id']
@@ -78,49 +398,84 @@ class MemoryEngine:
     
     def get_entry(self, entry_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific memory entry"""
-        for entry in self.memory_data:
-            if entry.get('id') == entry_id:
-                return entry
-        return None
+        return self.memory_data.get(entry_id)
     
-    def search_entries(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
-        """Search memory entries by command or result"""
+    def search_entries(self, query: str, limit: int = 10, agent: Optional[str] = None,
+                       since_ts: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Search memory entries by command or result, optionally only for one
+        agent or since an epoch timestamp"""
         results = []
+        if not self.memory_data:
+            return results
+        
         query_lower = query.lower()
         
-        for entry in reversed(self.memory_data):
-            if (query_lower in entry.get('command', '').lower() or 
-                query_lower in entry.get('result', '').lower()):
-                results.append(entry)
-                if len(results) >= limit:
+        # Entry timestamps are local ISO 8601 strings, which sort by time;
+        # imports add old entries at the newest end, so older entries are
+        # skipped rather than ending the search
+        since = datetime.fromtimestamp(since_ts).isoformat() if since_ts is not None else None
+        
+        if agent is not None:
+            with self._search_lock:
+                search_text = self._search_text
+                positions = self._positions
+                for entry in reversed(self._by_agent.get(agent, {}).values()):
+                    if len(results) >= limit:
+                        break
+                    if since and entry.get('timestamp', '') < since:
+                        continue
+                    if query_lower in search_text[positions[entry['id']]]:
+                        results.append(entry)
+            return results
+        
+        # Writes only append to these lists or blank out deleted entries, and a
+        # rebuild replaces them, so the snapshot stays consistent after unlocking
+        with self._search_lock:
+            offsets = self._offsets
+            search_entries = self._search_entries
+            segments = self._get_search_segments()
+        
+        # One C-level search per blob segment, newest first; each hit is
+        # mapped back to its entry by offset and the search resumes below it
+        for first, blob in reversed(segments):
+            base = offsets[first]
+            end = len(blob)
+            while len(results) < limit:
+                index = blob.rfind(query_lower, 0, end)
+                if index < 0:
                     break
+                position = bisect_right(offsets, base + index) - 1
+                entry = search_entries[position]
+                if entry is not None and not (since and entry.get('timestamp', '') < since):
+                    results.append(entry)
+                if position == first:
+                    break
+                end = offsets[position] - base - len(SEARCH_SEPARATOR)
         
         return results
     
     def get_recent_entries(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get recent memory entries"""
-        return self.memory_data[-limit:] if self.memory_data else []
+        recent = list(islice(reversed(self.memory_data.values()), limit))
+        recent.reverse()
+        return recent
     
     def get_entries_by_agent(self, agent: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Get entries by specific agent"""
-        results = []
-        for entry in reversed(self.memory_data):
-            if entry.get('agent') == agent:
-                results.append(entry)
-                if len(results) >= limit:
-                    break
-        return results
+        with self._search_lock:
+            return list(islice(reversed(self._by_agent.get(agent, {}).values()), limit))
     
     def delete_entry(self, entry_id: str) -> bool:
         """Delete a memory entry"""
         try:
-            for i, entry in enumerate(self.memory_data):
-                if entry.get('id') == entry_id:
-                    del self.memory_data[i]
-                    self.save_memory()
-                    logger.info(f"🗑️ Deleted memory entry: {entry_id}")
-                    return True
-            return False
+            entry = self.memory_data.pop(entry_id, None)
+            if entry is None:
+                return False
+            
+            self._unindex_entry(entry)
+            self._write_queue.put({'op': 'delete', 'id': entry_id})
+            logger.info(f"🗑️ Deleted memory entry: {entry_id}")
+            return True
         except Exception as e:
             logger.error(f"❌ Failed to delete memory entry: {e}")
             return False
@@ -128,8 +483,9 @@ class MemoryEngine:
     def clear_memory(self):
         """Clear all memory entries"""
         try:
-            self.memory_data = []
-            self.save_memory()
+            self.memory_data = {}
+            self._rebuild_index()
+            self._schedule_save()
             logger.info("🧹 Memory cleared")
         except Exception as e:
             logger.error(f"❌ Failed to clear memory: {e}")
@@ -137,8 +493,8 @@ class MemoryEngine:
     def export_memory(self, file_path: str) -> bool:
         """Export memory to file"""
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(self.memory_data, f, indent=2, ensure_ascii=False)
+            with open(file_path, 'wb') as f:
+                f.write(self._dumps(list(self.memory_data.values()), indent=True))
             logger.info(f"📤 Memory exported to: {file_path}")
             return True
         except Exception as e:
@@ -148,12 +504,17 @@ class MemoryEngine:
     def import_memory(self, file_path: str) -> bool:
         """Import memory from file"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                imported_data = json.load(f)
+            with open(file_path, 'rb') as f:
+                imported_data = self._loads(f.read())
             
-            if isinstance(imported_data, list):
-                self.memory_data.extend(imported_data)
-                self.save_memory()
+            # Check every entry before touching memory_data so a bad file
+            # cannot leave it half imported
+            if isinstance(imported_data, list) and all(
+                    isinstance(entry, dict) and isinstance(entry.get('agent'), Hashable)
+                    for entry in imported_data):
+                self.memory_data.update(self._keyed(imported_data))
+                self._rebuild_index()
+                self._schedule_save()
                 logger.info(f"📥 Memory imported from: {file_path}")
                 return True
             return False
@@ -165,22 +526,18 @@ class MemoryEngine:
         """Get memory statistics"""
         try:
             total_entries = len(self.memory_data)
-            successful_entries = sum(1 for entry in self.memory_data if entry.get('success', False))
+            successful_entries = self._success_count
             failed_entries = total_entries - successful_entries
             
-            agents = {}
-            for entry in self.memory_data:
-                agent = entry.get('agent', 'unknown')
-                agents[agent] = agents.get(agent, 0) + 1
-            
+            entries = self.memory_data.values()
             return {
                 "total_entries": total_entries,
                 "successful_entries": successful_entries,
                 "failed_entries": failed_entries,
                 "success_rate": (successful_entries / total_entries * 100) if total_entries > 0 else 0,
-                "agents": agents,
-                "oldest_entry": self.memory_data[0]['timestamp'] if self.memory_data else None,
-                "newest_entry": self.memory_data[-1]['timestamp'] if self.memory_data else None
+                "agents": dict(self._agent_counts),
+                "oldest_entry": next(iter(entries))['timestamp'] if entries else None,
+                "newest_entry": next(reversed(entries))['timestamp'] if entries else None
             }
         except Exception as e:
             logger.error(f"❌ Failed to get statistics: {e}")
@@ -188,4 +545,4 @@ class MemoryEngine:
     
     def generate_id(self) -> str:
         """Generate unique ID for memory entry"""
-        return f"mem_{int(time.time() * 1000)}_{len(self.memory_data)}" 
\ No newline at end of file
+        return f"mem_{time.time_ns()}_{next(self._id_counter)}" 
\ No newline at end of file
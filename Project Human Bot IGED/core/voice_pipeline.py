@@ -5,8 +5,9 @@ Handles speech recognition using Whisper
 
 import threading
 import queue
-import time
 import logging
+from collections import deque
+from functools import lru_cache
 from typing import Optional, Callable
 
 # Try to import voice recognition libraries
@@ -16,14 +17,52 @@ try:
 except ImportError:
     SPEECH_RECOGNITION_AVAILABLE = False
 
+from core.lazy import is_available, lazy_import
+
+# torch and the Whisper backends take seconds to import, so they are only
+# loaded when a model is first initialized
+np = lazy_import("numpy")
+torch = lazy_import("torch")
+whisper = lazy_import("whisper")
+WhisperModel = lazy_import("faster_whisper.WhisperModel")
+WHISPER_AVAILABLE = all(is_available(name) for name in ("numpy", "torch", "whisper"))
+FASTER_WHISPER_AVAILABLE = all(is_available(name) for name in ("numpy", "faster_whisper"))
+
 try:
-    import whisper
-    WHISPER_AVAILABLE = True
+    import webrtcvad
+    WEBRTCVAD_AVAILABLE = True
 except ImportError:
-    WHISPER_AVAILABLE = False
+    WEBRTCVAD_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# Whisper expects 16 kHz mono float32 samples
+WHISPER_SAMPLE_RATE = 16000
+
+# Voice activity detection settings: captures shorter than MIN_AUDIO_SECONDS
+# or with fewer voiced 30 ms frames than MIN_VOICED_RATIO are dropped
+VAD_FRAME_MS = 30
+MIN_VOICED_RATIO = 0.3
+MIN_AUDIO_SECONDS = 0.3
+
+# Longest single capture in seconds; short phrases let transcription start
+# sooner (Whisper still pads each capture to a 30 s window)
+PHRASE_TIME_LIMIT = 4
+
+# Most utterances waiting in the audio queue to transcribe in one Whisper pass
+MAX_TRANSCRIBE_BATCH = 4
+
+@lru_cache(maxsize=4)
+def _load_whisper(name: str, device: str, int8: bool):
+    """Load a Whisper model once per process and share it between pipelines"""
+    if int8:
+        return WhisperModel(name, device=device, compute_type="int8")
+    model = whisper.load_model(name, device=device)
+    if device == "cuda":
+        # load_model keeps FP32 weights; FP16 halves their memory traffic
+        model = model.half()
+    return model
+
 class VoicePipeline:
     def __init__(self, command_parser, orchestrator, memory_engine):
         self.parser = command_parser
@@ -31,9 +70,14 @@ class VoicePipeline:
         self.memory = memory_engine
         self.recognizer = None
         self.whisper_model = None
+        self._faster_whisper = False
+        self._whisper_fp16 = False
         self.is_listening = False
+        self._stop_background = None
+        self.vad = webrtcvad.Vad(2) if WEBRTCVAD_AVAILABLE else None
         self.audio_queue = queue.Queue()
-        self.callback_queue = queue.Queue()
+        self.callback_queue = deque()
+        self._callback_event = threading.Event()
         
         # Initialize voice recognition
         if SPEECH_RECOGNITION_AVAILABLE:
@@ -46,8 +90,17 @@ class VoicePipeline:
         """Initialize Whisper model for offline speech recognition"""
         try:
             logger.info("🎤 Initializing Whisper model...")
-            self.whisper_model = whisper.load_model("base")
-            logger.info("✅ Whisper model loaded successfully")
+            device = "cuda" if WHISPER_AVAILABLE and torch.cuda.is_available() else "cpu"
+            
+            if device == "cpu" and FASTER_WHISPER_AVAILABLE:
+                # int8 CTranslate2 model is several times faster than FP32 on CPU
+                self.whisper_model = _load_whisper("base", "cpu", True)
+                self._faster_whisper = True
+            else:
+                self.whisper_model = _load_whisper("base", device, False)
+                self._whisper_fp16 = device == "cuda"
+            
+            logger.info(f"✅ Whisper model loaded successfully ({device})")
         except Exception as e:
             logger.error(f"❌ Failed to load Whisper model: {e}")
             self.whisper_model = None
@@ -75,6 +128,13 @@ class VoicePipeline:
     def stop_listening(self):
         """Stop voice listening"""
         self.is_listening = False
+        if self._stop_background:
+            self._stop_background(wait_for_stop=False)
+            self._stop_background = None
+        
+        # Wake the worker threads so they exit
+        self.audio_queue.put(None)
+        self._callback_event.set()
         logger.info("🛑 Voice listening stopped")
     
     def _listen_microphone(self):
@@ -84,39 +144,80 @@ class VoicePipeline:
             return
             
         try:
-            with sr.Microphone() as source:
+            microphone = sr.Microphone()
+            with microphone as source:
                 # Adjust for ambient noise
                 self.recognizer.adjust_for_ambient_noise(source, duration=1)
-                logger.info("🎤 Microphone ready")
-                
-                while self.is_listening:
-                    try:
-                        logger.debug("🎤 Listening for speech...")
-                        audio = self.recognizer.listen(source, timeout=1, phrase_time_limit=10)
-                        self.audio_queue.put(audio)
-                    except sr.WaitTimeoutError:
-                        continue
-                    except Exception as e:
-                        logger.error(f"❌ Microphone error: {e}")
-                        time.sleep(1)
-                        
+            logger.info("🎤 Microphone ready")
+            
+            # Capture runs on speech_recognition's own thread; only voiced
+            # audio reaches the queue
+            self._stop_background = self.recognizer.listen_in_background(
+                microphone, self._on_audio_captured, phrase_time_limit=PHRASE_TIME_LIMIT)
+            
         except Exception as e:
             logger.error(f"❌ Failed to initialize microphone: {e}")
     
+    def _on_audio_captured(self, recognizer, audio):
+        """Queue captured audio if it contains speech"""
+        try:
+            if self._is_voiced(audio):
+                self.audio_queue.put(audio)
+            else:
+                logger.debug("🎤 Dropped silent audio")
+        except Exception as e:
+            logger.error(f"❌ Microphone error: {e}")
+    
+    def _is_voiced(self, audio) -> bool:
+        """Check whether enough of the audio is speech according to the VAD"""
+        if not self.vad:
+            return True
+        
+        pcm = audio.get_raw_data(convert_rate=WHISPER_SAMPLE_RATE, convert_width=2)
+        frame_bytes = WHISPER_SAMPLE_RATE * VAD_FRAME_MS // 1000 * 2
+        frames = range(0, len(pcm) - frame_bytes + 1, frame_bytes)
+        if not frames:
+            return False
+        
+        voiced = sum(1 for start in frames
+                     if self.vad.is_speech(pcm[start:start + frame_bytes], WHISPER_SAMPLE_RATE))
+        return voiced >= MIN_VOICED_RATIO * len(frames)
+    
     def _audio_processing_loop(self):
-        """Process audio from queue"""
-        while self.is_listening:
+        """Process audio from queue until stop_listening queues None"""
+        stopping = False
+        while not stopping:
             try:
-                audio = self.audio_queue.get(timeout=1)
-                self._process_audio(audio)
-            except queue.Empty:
-                continue
+                audio = self.audio_queue.get()
+                if audio is None:
+                    break
+                
+                batch = [audio]
+                while len(batch) < MAX_TRANSCRIBE_BATCH:
+                    try:
+                        audio = self.audio_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if audio is None:
+                        stopping = True
+                        break
+                    batch.append(audio)
+                
+                if len(batch) > 1 and self.whisper_model and not self._faster_whisper:
+                    self._process_audio_batch(batch)
+                else:
+                    for audio in batch:
+                        self._process_audio(audio)
             except Exception as e:
                 logger.error(f"❌ Audio processing error: {e}")
     
     def _process_audio(self, audio):
         """Process audio and convert to text"""
         try:
+            if self._is_too_short(audio):
+                logger.debug("🎤 No speech detected")
+                return
+            
             # Try Whisper first (offline)
             if self.whisper_model:
                 text = self._whisper_transcribe(audio)
@@ -124,36 +225,68 @@ class VoicePipeline:
                 # Fallback to speech recognition
                 text = self._speech_recognition_transcribe(audio)
             
-            if text and text.strip():
-                logger.info(f"🎤 Transcribed: {text}")
-                self._handle_transcription(text)
-            else:
+            self._dispatch_text(text)
+                
+        except Exception as e:
+            logger.error(f"❌ Audio transcription failed: {e}")
+    
+    def _process_audio_batch(self, batch):
+        """Process several utterances with one Whisper pass"""
+        try:
+            batch = [audio for audio in batch if not self._is_too_short(audio)]
+            if not batch:
                 logger.debug("🎤 No speech detected")
+                return
+            
+            try:
+                texts = self._whisper_transcribe_batch(batch)
+            except Exception as e:
+                logger.error(f"❌ Whisper batch transcription failed: {e}")
+                # Transcribe one at a time rather than drop the whole batch
+                for audio in batch:
+                    self._process_audio(audio)
+                return
+            
+            for text in texts:
+                self._dispatch_text(text)
                 
         except Exception as e:
             logger.error(f"❌ Audio transcription failed: {e}")
     
+    def _dispatch_text(self, text: str):
+        """Handle transcribed text if any speech was recognized"""
+        if text and text.strip():
+            logger.info(f"🎤 Transcribed: {text}")
+            self._handle_transcription(text)
+        else:
+            logger.debug("🎤 No speech detected")
+    
+    @staticmethod
+    def _is_too_short(audio) -> bool:
+        """Check whether audio is too short to hold a command"""
+        return len(audio.frame_data) < audio.sample_rate * audio.sample_width * MIN_AUDIO_SECONDS
+    
+    @staticmethod
+    def _to_samples(audio):
+        """Convert audio to float32 samples at Whisper's sample rate"""
+        # 16-bit PCM at Whisper's rate, without a temporary file on disk
+        pcm = audio.get_raw_data(convert_rate=WHISPER_SAMPLE_RATE, convert_width=2)
+        return np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+    
     def _whisper_transcribe(self, audio) -> str:
         """Transcribe audio using Whisper"""
         try:
             if not self.whisper_model:
                 return ""
                 
-            # Convert audio to format Whisper can process
-            audio_data = audio.get_wav_data()
-            
-            # Save temporary audio file
-            temp_file = "temp_audio.wav"
-            with open(temp_file, "wb") as f:
-                f.write(audio_data)
+            samples = self._to_samples(audio)
             
             # Transcribe with Whisper
-            result = self.whisper_model.transcribe(temp_file)
+            if self._faster_whisper:
+                segments, _ = self.whisper_model.transcribe(samples, vad_filter=True)
+                return "".join(segment.text for segment in segments).strip()
             
-            # Clean up
-            import os
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
+            result = self.whisper_model.transcribe(samples, fp16=self._whisper_fp16)
             
             return result["text"].strip()
             
@@ -161,6 +294,21 @@ class VoicePipeline:
             logger.error(f"❌ Whisper transcription failed: {e}")
             return ""
     
+    def _whisper_transcribe_batch(self, batch) -> list:
+        """Transcribe several utterances with one batched Whisper decode"""
+        # Utterances are capped by PHRASE_TIME_LIMIT, well inside Whisper's
+        # 30 s window, so each one is a single padded segment
+        model = self.whisper_model
+        mel = torch.stack([
+            whisper.log_mel_spectrogram(
+                whisper.pad_or_trim(torch.from_numpy(self._to_samples(audio))),
+                n_mels=model.dims.n_mels)
+            for audio in batch
+        ]).to(model.device)
+        
+        options = whisper.DecodingOptions(fp16=self._whisper_fp16)
+        return [result.text.strip() for result in whisper.decode(model, mel, options)]
+    
     def _speech_recognition_transcribe(self, audio) -> str:
         """Transcribe audio using speech recognition"""
         if not SPEECH_RECOGNITION_AVAILABLE or not self.recognizer:
@@ -193,12 +341,13 @@ class VoicePipeline:
             )
             
             # Queue callback for UI update
-            self.callback_queue.put({
+            self.callback_queue.append({
                 'type': 'voice_command',
                 'text': text,
                 'result': result,
                 'command': command
             })
+            self._callback_event.set()
             
         except Exception as e:
             logger.error(f"❌ Failed to handle transcription: {e}")
@@ -213,10 +362,13 @@ class VoicePipeline:
         """Process callbacks for UI updates"""
         while self.is_listening:
             try:
-                callback = self.callback_queue.get(timeout=1)
-                self._process_callback(callback)
-            except queue.Empty:
-                continue
+                # Cleared before draining so a callback added meanwhile
+                # wakes the next wait instead of being missed; stop_listening
+                # sets the event to end the loop
+                self._callback_event.wait()
+                self._callback_event.clear()
+                while self.callback_queue:
+                    self._process_callback(self.callback_queue.popleft())
             except Exception as e:
                 logger.error(f"❌ Callback processing error: {e}")
     
@@ -242,5 +394,5 @@ class VoicePipeline:
             'is_listening': self.is_listening,
             'whisper_loaded': self.whisper_model is not None,
             'audio_queue_size': self.audio_queue.qsize(),
-            'callback_queue_size': self.callback_queue.qsize()
+            'callback_queue_size': len(self.callback_queue)
         } 
\ No newline at end of file
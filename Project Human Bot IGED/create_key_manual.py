@@ -21,37 +21,31 @@ def create_encryption_key():
         key = Fernet.generate_key()
         print(f"✅ Key generated: {len(key)} bytes")
         
-        # Get current directory
-        current_dir = Path.cwd()
-        print(f"📁 Current directory: {current_dir}")
-        
-        # Create config path
-        config_dir = current_dir / "config"
+        # Create config directory
+        config_dir = Path.cwd() / "config"
         print(f"📁 Config directory: {config_dir}")
-        print(f"📁 Config exists: {config_dir.exists()}")
-        print(f"📁 Config is directory: {config_dir.is_dir()}")
+        os.makedirs(config_dir, exist_ok=True)
         
         # Create key file path
         key_file = config_dir / "secret.key"
         print(f"🔑 Key file path: {key_file}")
         
-        # Try to write the key
+        # Try to write the key; 'x' fails instead of replacing an existing key
         print("💾 Writing key to file...")
-        key_file.write_bytes(key)
+        with open(key_file, 'xb') as f:
+            f.write(key)
+        
+        print(f"✅ Key file created successfully!")
+        print(f"📁 File size: {len(key)} bytes")
+        return True
         
-        # Verify the file was created
-        if key_file.exists():
-            print(f"✅ Key file created successfully!")
-            print(f"📁 File size: {key_file.stat().st_size} bytes")
-            print(f"🔑 Key file location: {key_file.absolute()}")
-            return True
-        else:
-            print("❌ Key file was not created")
-            return False
-            
     except ImportError as e:
         print(f"❌ Failed to import cryptography: {e}")
         return False
+    except FileExistsError:
+        print(f"❌ Key file already exists: {key_file}")
+        print("Delete it first to create a new key; data encrypted with it will become unreadable")
+        return False
     except Exception as e:
         print(f"❌ Error creating key: {e}")
         print(f"Error type: {type(e).__name__}")
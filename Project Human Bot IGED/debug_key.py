@@ -30,10 +30,13 @@ try:
     print(f"Key path 2: {key_path2}")
     print(f"Key path 3: {key_path3}")
     
-    # Try writing with pathlib
-    key_path1.write_bytes(key)
-    print("✅ Key saved successfully with pathlib!")
+    # Try writing without replacing an existing key
+    with open(key_path1, 'xb') as f:
+        f.write(key)
+    print("✅ Key saved successfully!")
     
+except FileExistsError:
+    print(f"⚠️ Key file already exists, not overwritten: {key_path1}")
 except Exception as e:
     print(f"❌ Error: {e}")
     import traceback
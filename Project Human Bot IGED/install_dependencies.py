@@ -127,23 +127,22 @@ def create_directories():
 
 def generate_encryption_key():
     """Generate encryption key if it doesn't exist"""
-    key_path = Path("config/secret.key")
-    if not key_path.exists():
-        print("🔐 Generating encryption key...")
-        try:
-            from cryptography.fernet import Fernet
-            key = Fernet.generate_key()
-            key_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(key_path, "wb") as f:
-                f.write(key)
-            print("✅ Encryption key generated")
-            return True
-        except Exception as e:
-            print(f"❌ Failed to generate encryption key: {e}")
-            return False
-    else:
+    try:
+        from cryptography.fernet import Fernet
+        os.makedirs("config", exist_ok=True)
+        
+        # 'x' creates the file only if no key exists yet
+        with open("config/secret.key", "xb") as f:
+            print("🔐 Generating encryption key...")
+            f.write(Fernet.generate_key())
+        print("✅ Encryption key generated")
+        return True
+    except FileExistsError:
         print("✅ Encryption key already exists")
         return True
+    except Exception as e:
+        print(f"❌ Failed to generate encryption key: {e}")
+        return False
 
 def main():
     """Main installation function"""
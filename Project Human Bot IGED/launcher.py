@@ -19,6 +19,7 @@ from core.voice_pipeline import VoicePipeline
 from core.command_parser import CommandParser
 from core.memory_engine import MemoryEngine
 from core.encryption import EncryptionManager
+from core.lazy import is_available
 from agents.orchestrator import Orchestrator
 from ui.win_gui.main_window import IGEDGUI
 from admin_panel.web_admin import WebAdminPanel
@@ -37,6 +38,9 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Set by the signal handler; the main thread notices it and shuts down cleanly
+_SHUTDOWN = threading.Event()
+
 class IGEDLauncher:
     def __init__(self):
         self.running = False
@@ -99,11 +103,20 @@ class IGEDLauncher:
         """Start the GUI interface"""
         try:
             logger.info("🖥️ Starting GUI interface...")
-            self.components['gui'] = IGEDGUI(self.components)
-            self.components['gui'].run()
+            gui = IGEDGUI(self.components)
+            self.components['gui'] = gui
+            self._watch_for_shutdown(gui)
+            gui.run()
         except Exception as e:
             logger.error(f"❌ Failed to start GUI: {e}")
     
+    def _watch_for_shutdown(self, gui):
+        """Close the GUI from the Tk loop once a shutdown is requested"""
+        if _SHUTDOWN.is_set():
+            gui.on_closing()
+        else:
+            gui.root.after(500, self._watch_for_shutdown, gui)
+    
     def start_web_admin(self):
         """Start the web admin panel"""
         try:
@@ -148,6 +161,12 @@ class IGEDLauncher:
             # Start GUI (main thread)
             self.start_gui()
             
+            # Without a window, keep serving until a shutdown signal arrives;
+            # the timeout keeps the wait responsive to signals on Windows
+            if 'gui' not in self.components:
+                while not _SHUTDOWN.wait(timeout=1.0):
+                    pass
+            
         except KeyboardInterrupt:
             logger.info("🛑 Shutdown requested...")
         except Exception as e:
@@ -172,12 +191,17 @@ class IGEDLauncher:
         if 'watchdog' in self.components:
             self.components['watchdog'].stop()
         
+        # Write out pending memory changes as a compacted log
+        if 'memory' in self.components:
+            self.components['memory'].compact()
+            self.components['memory'].flush(timeout=10)
+        
         logger.info("✅ IGED shutdown complete")
 
 def signal_handler(signum, frame):
     """Handle shutdown signals"""
     logger.info(f"📡 Received signal {signum}, shutting down...")
-    sys.exit(0)
+    _SHUTDOWN.set()
 
 def main():
     """Main entry point"""
@@ -192,27 +216,8 @@ def main():
     
     # Check dependencies
     print("🔧 Checking dependencies...")
-    missing_deps = []
-    
-    try:
-        import cryptography
-    except ImportError:
-        missing_deps.append("cryptography")
-    
-    try:
-        import pandas
-    except ImportError:
-        missing_deps.append("pandas")
-    
-    try:
-        import numpy
-    except ImportError:
-        missing_deps.append("numpy")
-    
-    try:
-        import matplotlib
-    except ImportError:
-        missing_deps.append("matplotlib")
+    missing_deps = [name for name in ("cryptography", "pandas", "numpy", "matplotlib")
+                    if not is_available(name)]
     
     if missing_deps:
         print(f"⚠️ Missing dependencies: {', '.join(missing_deps)}")
@@ -220,16 +225,11 @@ def main():
         print("💡 Or: install_deps.bat (Windows)")
         print("\n🚀 Starting IGED anyway... (some features may not work)")
     
-    # Check for required files
-    if not Path("config/secret.key").exists():
-        print("🔑 Generating encryption key...")
-        try:
-            from cryptography.fernet import Fernet
-            key = Fernet.generate_key()
-            Path("config").mkdir(exist_ok=True)
-            with open("config/secret.key", "wb") as f:
-                f.write(key)
-        except ImportError:
+    # Check for required files; EncryptionManager creates the key on first start
+    key_path = Path("config/secret.key")
+    if not key_path.is_file():
+        print("🔑 Encryption key will be generated on startup...")
+        if not is_available("cryptography"):
             print("❌ cryptography not available, cannot generate key")
             print("Please install: pip install cryptography")
             sys.exit(1)
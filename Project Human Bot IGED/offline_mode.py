@@ -24,6 +24,9 @@ class OfflineMode:
             'pypi.python.org'
         ]
         self.blocked_ports = [80, 443, 8080, 8443]
+        
+        # Built once instead of on every request filter call
+        self._local_patterns = ('localhost', '127.0.0.1', '0.0.0.0', '::1')
     
     def enable(self):
         """Enable offline mode"""
@@ -128,23 +131,14 @@ class OfflineMode:
         if not url:
             return False
         
-        # Check for local URLs
-        local_patterns = [
-            'localhost',
-            '127.0.0.1',
-            '0.0.0.0',
-            '::1'
-        ]
+        url_lower = url.lower()
         
-        for pattern in local_patterns:
-            if pattern in url.lower():
+        # Check for local URLs
+        for pattern in self._local_patterns:
+            if pattern in url_lower:
                 return False
         
-        # Check for blocked domains
-        for domain in self.blocked_domains:
-            if domain in url.lower():
-                return True
-        
+        # Anything that is not local is treated as external
         return True
     
     def check_offline_status(self) -> Dict[str, Any]:
@@ -3,9 +3,21 @@ Discord Notification Plugin for IGED
 Sends notifications to Discord webhook
 """
 
-import requests
 import json
-from datetime import datetime
+from types import MappingProxyType
+
+# Try to import orjson for faster serialization
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def _dumps(data):
+    """Serialize a message to JSON bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data).encode('utf-8')
 
 class Plugin:
     def __init__(self):
@@ -13,6 +25,15 @@ class Plugin:
         self.version = "1.0.0"
         self.description = "Sends notifications to Discord webhook"
         self.webhook_url = None
+        self._session = None
+        # Parts of the embed that are the same for every notification
+        self._embed_template = MappingProxyType({
+            "title": "IGED Command Executed",
+            "color": 0x00ff00,
+            "footer": {
+                "text": "IGED - Sovereign AI Assistant"
+            }
+        })
     
     def run(self, input_text):
         """Run the plugin with input text"""
@@ -22,21 +43,22 @@ class Plugin:
                 return "❌ Discord webhook URL not configured. Set webhook_url in plugin."
             
             # Create Discord message
+            from datetime import datetime
             message = {
                 "content": f"🤖 IGED Notification: {input_text}",
                 "embeds": [{
-                    "title": "IGED Command Executed",
+                    **self._embed_template,
                     "description": input_text,
-                    "color": 0x00ff00,
-                    "timestamp": datetime.now().isoformat(),
-                    "footer": {
-                        "text": "IGED - Sovereign AI Assistant"
-                    }
+                    "timestamp": datetime.now().isoformat()
                 }]
             }
             
-            # Send to Discord
-            response = requests.post(self.webhook_url, json=message)
+            # Send to Discord over a reused keep-alive connection
+            if self._session is None:
+                import requests
+                self._session = requests.Session()
+                self._session.headers.update({"Content-Type": "application/json"})
+            response = self._session.post(self.webhook_url, data=_dumps(message), timeout=5)
             
             if response.status_code == 204:
                 return f"✅ Discord notification sent: {input_text}"
@@ -3,19 +3,45 @@ IGED GUI - Windows Interface
 Main window for the IGED assistant
 """
 
-import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox
 import threading
 import queue
+from concurrent.futures import ThreadPoolExecutor
 import time
-from datetime import datetime
 import logging
 
+from core.lazy import lazy_import
+
+# tkinter is only imported once a window is actually created
+tk = lazy_import("tkinter")
+ttk = lazy_import("tkinter.ttk")
+scrolledtext = lazy_import("tkinter.scrolledtext")
+messagebox = lazy_import("tkinter.messagebox")
+
 logger = logging.getLogger(__name__)
 
+# Queued to wake the message thread and tell it to exit
+_SHUTDOWN = object()
+
 class IGEDGUI:
     def __init__(self, components):
         self.components = components
+        # (second, "%H:%M:%S" text) of the last log_output timestamp
+        self._log_timestamp = (0, "")
+        # Memory tree item id -> the entry shown in that row
+        self._memory_rows = {}
+        # Latest pending memory tree refresh; older ones are discarded
+        self._memory_request = None
+        # Status refresh already queued with after_idle
+        self._status_refresh_pending = False
+        # Tk widget path -> text last written by _set_status_text
+        self._status_texts = {}
+        
+        # Commands run on a small reusable pool instead of a thread each;
+        # memory fetches get their own worker so long commands cannot hold
+        # up loading or searching memory
+        self.command_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="iged-cmd")
+        self.memory_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="iged-memory")
+        
         self.root = tk.Tk()
         self.setup_gui()
         self.message_queue = queue.Queue()
@@ -252,7 +278,7 @@ class IGEDGUI:
         self.command_entry.delete(0, tk.END)
         
         # Execute in separate thread
-        threading.Thread(target=self._execute_command_thread, args=(command,), daemon=True).start()
+        self.command_executor.submit(self._execute_command_thread, command)
     
     def _execute_command_thread(self, command):
         """Execute command in background thread"""
@@ -291,7 +317,11 @@ class IGEDGUI:
     
     def log_output(self, message):
         """Add message to output"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
+        second = int(time.time())
+        cached_second, timestamp = self._log_timestamp
+        if second != cached_second:
+            timestamp = time.strftime("%H:%M:%S", time.localtime(second))
+            self._log_timestamp = (second, timestamp)
         formatted_message = f"[{timestamp}] {message}\n"
         
         # Add to queue for thread-safe update
@@ -299,37 +329,37 @@ class IGEDGUI:
     
     def _process_messages(self):
         """Process messages from queue"""
+        log_error = logger.error
         while self.running:
+            message = self.message_queue.get()
+            if message is _SHUTDOWN:
+                break
+            
             try:
-                message = self.message_queue.get(timeout=1)
-                self.output_text.insert(tk.END, message)
-                self.output_text.see(tk.END)
-            except queue.Empty:
-                continue
+                messages = [message]
+                # Drain whatever else is waiting so a burst becomes one insert
+                try:
+                    while True:
+                        message = self.message_queue.get_nowait()
+                        if message is _SHUTDOWN:
+                            self.running = False
+                            break
+                        messages.append(message)
+                except queue.Empty:
+                    pass
+                # Widgets are only touched from the Tk main loop
+                self.root.after_idle(self._flush_output, "".join(messages))
             except Exception as e:
-                logger.error(f"Message processing error: {e}")
+                log_error(f"Message processing error: {e}")
+    
+    def _flush_output(self, text):
+        """Append a batch of messages to the output area"""
+        self.output_text.insert(tk.END, text)
+        self.output_text.see(tk.END)
     
     def load_memory(self):
         """Load memory entries into tree view"""
-        try:
-            # Clear existing items
-            for item in self.memory_tree.get_children():
-                self.memory_tree.delete(item)
-            
-            if 'memory' in self.components:
-                memory = self.components['memory']
-                entries = memory.get_recent_entries(50)
-                
-                for entry in entries:
-                    timestamp = entry.get('timestamp', '')[:19]  # Truncate to seconds
-                    command = entry.get('command', '')[:50]  # Truncate long commands
-                    agent = entry.get('agent', 'unknown')
-                    success = "✅" if entry.get('success', False) else "❌"
-                    
-                    self.memory_tree.insert('', 'end', values=(timestamp, command, agent, success))
-                    
-        except Exception as e:
-            logger.error(f"Failed to load memory: {e}")
+        self._refresh_memory_tree(lambda memory: memory.get_recent_entries(50), "load")
     
     def search_memory(self):
         """Search memory entries"""
@@ -338,25 +368,47 @@ class IGEDGUI:
             self.load_memory()
             return
         
+        self._refresh_memory_tree(lambda memory: memory.search_entries(query, 20), "search")
+    
+    def _refresh_memory_tree(self, fetch, action):
+        """Fetch memory rows on the pool and show them once they are ready"""
+        future = self.memory_executor.submit(self._prepare_memory_rows, fetch)
+        self._memory_request = future
+        self._poll_memory_rows(future, action)
+    
+    def _prepare_memory_rows(self, fetch):
+        """Fetch entries and format their tree rows off the Tk thread"""
+        entries = []
+        if 'memory' in self.components:
+            entries = fetch(self.components['memory'])
+        
+        rows = [(entry.get('timestamp', '')[:19],  # Truncate to seconds
+                 entry.get('command', '')[:50],  # Truncate long commands
+                 entry.get('agent', 'unknown'),
+                 "✅" if entry.get('success', False) else "❌")
+                for entry in entries]
+        return rows, entries
+    
+    def _poll_memory_rows(self, future, action):
+        """Show prepared memory rows from the Tk loop once the fetch is done"""
+        if future is not self._memory_request:
+            return
+        if not future.done():
+            self.root.after(20, self._poll_memory_rows, future, action)
+            return
+        
         try:
-            # Clear existing items
-            for item in self.memory_tree.get_children():
-                self.memory_tree.delete(item)
-            
-            if 'memory' in self.components:
-                memory = self.components['memory']
-                entries = memory.search_entries(query, 20)
-                
-                for entry in entries:
-                    timestamp = entry.get('timestamp', '')[:19]
-                    command = entry.get('command', '')[:50]
-                    agent = entry.get('agent', 'unknown')
-                    success = "✅" if entry.get('success', False) else "❌"
-                    
-                    self.memory_tree.insert('', 'end', values=(timestamp, command, agent, success))
-                    
+            rows, entries = future.result()
+            self._show_memory_rows(rows, entries)
         except Exception as e:
-            logger.error(f"Failed to search memory: {e}")
+            logger.error(f"Failed to {action} memory: {e}")
+    
+    def _show_memory_rows(self, rows, entries):
+        """Replace the memory tree contents with prepared rows"""
+        tree = self.memory_tree
+        tree.delete(*tree.get_children())
+        self._memory_rows = {tree.insert('', 'end', values=values): entry
+                             for values, entry in zip(rows, entries)}
     
     def on_memory_select(self, event):
         """Handle memory item selection"""
@@ -365,63 +417,73 @@ class IGEDGUI:
             return
         
         try:
-            item = self.memory_tree.item(selection[0])
-            timestamp = item['values'][0]
-            
-            if 'memory' in self.components:
-                memory = self.components['memory']
-                entries = memory.get_recent_entries(100)
+            entry = self._memory_rows.get(selection[0])
+            if entry is not None:
+                details = (f"Time: {entry.get('timestamp', '')}\n"
+                           f"Command: {entry.get('command', '')}\n"
+                           f"Agent: {entry.get('agent', '')}\n"
+                           f"Success: {entry.get('success', '')}\n"
+                           f"Result: {entry.get('result', '')}\n")
                 
-                for entry in entries:
-                    if entry.get('timestamp', '')[:19] == timestamp:
-                        details = f"Time: {entry.get('timestamp', '')}\n"
-                        details += f"Command: {entry.get('command', '')}\n"
-                        details += f"Agent: {entry.get('agent', '')}\n"
-                        details += f"Success: {entry.get('success', '')}\n"
-                        details += f"Result: {entry.get('result', '')}\n"
-                        
-                        self.memory_details.delete(1.0, tk.END)
-                        self.memory_details.insert(1.0, details)
-                        break
+                self.memory_details.delete(1.0, tk.END)
+                self.memory_details.insert(1.0, details)
                         
         except Exception as e:
             logger.error(f"Failed to load memory details: {e}")
     
     def refresh_status(self):
         """Refresh system status"""
+        # Coalesce bursts of refresh requests into one update
+        if not self._status_refresh_pending:
+            self._status_refresh_pending = True
+            self.root.after_idle(self._refresh_status_now)
+    
+    def _refresh_status_now(self):
+        """Rebuild the status texts and update the widgets that changed"""
+        self._status_refresh_pending = False
         try:
+            orch_status = None
+            if 'orchestrator' in self.components:
+                orch_status = self.components['orchestrator'].get_system_status()
+            
             # System info
-            system_info = "IGED System Status\n"
-            system_info += "=" * 50 + "\n"
+            system_lines = ["IGED System Status", "=" * 50]
             
             if 'voice' in self.components:
                 voice_status = self.components['voice'].get_status()
-                system_info += f"Voice Pipeline: {'Active' if voice_status['is_listening'] else 'Inactive'}\n"
-                system_info += f"Whisper Model: {'Loaded' if voice_status['whisper_loaded'] else 'Not Loaded'}\n"
+                system_lines.append(f"Voice Pipeline: {'Active' if voice_status['is_listening'] else 'Inactive'}")
+                system_lines.append(f"Whisper Model: {'Loaded' if voice_status['whisper_loaded'] else 'Not Loaded'}")
             
-            if 'orchestrator' in self.components:
-                orch_status = self.components['orchestrator'].get_system_status()
-                system_info += f"Active Agents: {orch_status['total_agents']}\n"
-                system_info += f"Active Plugins: {orch_status['total_plugins']}\n"
+            if orch_status:
+                system_lines.append(f"Active Agents: {orch_status['total_agents']}")
+                system_lines.append(f"Active Plugins: {orch_status['total_plugins']}")
             
-            self.system_info.delete(1.0, tk.END)
-            self.system_info.insert(1.0, system_info)
+            self._set_status_text(self.system_info, "\n".join(system_lines) + "\n")
             
             # Agents info
-            agents_info = "Agent Status\n"
-            agents_info += "=" * 30 + "\n"
+            agent_lines = ["Agent Status", "=" * 30]
             
-            if 'orchestrator' in self.components:
-                orch_status = self.components['orchestrator'].get_system_status()
-                for agent_name, status in orch_status['agents'].items():
-                    agents_info += f"{agent_name}: {status.get('status', 'unknown')}\n"
+            if orch_status:
+                agent_lines.extend(f"{agent_name}: {status.get('status', 'unknown')}"
+                                   for agent_name, status in orch_status['agents'].items())
             
-            self.agents_info.delete(1.0, tk.END)
-            self.agents_info.insert(1.0, agents_info)
+            self._set_status_text(self.agents_info, "\n".join(agent_lines) + "\n")
             
         except Exception as e:
             logger.error(f"Failed to refresh status: {e}")
     
+    def _set_status_text(self, widget, text):
+        """Replace a read-only status widget's text unless it is unchanged"""
+        key = str(widget)
+        if self._status_texts.get(key) == text:
+            return
+        self._status_texts[key] = text
+        
+        widget.configure(state='normal')
+        widget.delete(1.0, tk.END)
+        widget.insert(1.0, text)
+        widget.configure(state='disabled')
+    
     def clear_all_memory(self):
         """Clear all memory entries"""
         if messagebox.askyesno("Confirm", "Are you sure you want to clear all memory?"):
@@ -438,7 +500,7 @@ class IGEDGUI:
         try:
             if 'memory' in self.components:
                 memory = self.components['memory']
-                filename = f"memory_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+                filename = f"memory_export_{time.strftime('%Y%m%d_%H%M%S')}.json"
                 if memory.export_memory(filename):
                     self.log_output(f"📤 Memory exported to {filename}")
                 else:
@@ -449,6 +511,9 @@ class IGEDGUI:
     def on_closing(self):
         """Handle window closing"""
         self.running = False
+        self.message_queue.put(_SHUTDOWN)
+        self.command_executor.shutdown(wait=False)
+        self.memory_executor.shutdown(wait=False)
         self.root.destroy()
     
     def run(self):
@@ -3,40 +3,102 @@ Watchdog for IGED
 System monitoring and health checks
 """
 
+import os
+import shutil
 import threading
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 
-# Try to import psutil
-try:
-    import psutil
-    PSUTIL_AVAILABLE = True
-except ImportError:
-    PSUTIL_AVAILABLE = False
+from core.lazy import is_available, lazy_import
+
+# psutil is imported when the watchdog first uses it, not when this module loads
+psutil = lazy_import("psutil")
+PSUTIL_AVAILABLE = is_available("psutil")
 
 logger = logging.getLogger(__name__)
 
+# open_files() and connections() walk /proc/<pid>/fd and /proc/net, so they
+# are only refreshed on every Nth stats update
+HEAVY_STATS_EVERY = 4
+
+# Longest the monitoring loop waits on health checks before moving on
+HEALTH_CHECK_TIMEOUT = 10
+
+# Directory sizes are reused while a directory's own mtime is unchanged.
+# Files growing in place (e.g. logs) do not touch that mtime, so sizes are
+# still rescanned at least this often
+DIR_RESCAN_SECONDS = 300
+
+# Seconds between monitoring cycles. While every cycle comes back healthy the
+# interval doubles up to MAX_MONITOR_INTERVAL, and any problem resets it
+MONITOR_INTERVAL = 30
+MAX_MONITOR_INTERVAL = 300
+
+def _directory_usage(path: str) -> Tuple[int, int]:
+    """Total size in bytes and number of files under a directory"""
+    total_size = 0
+    file_count = 0
+    pending = [path]
+    while pending:
+        try:
+            entries = os.scandir(pending.pop())
+        except OSError:
+            # Skip unreadable directories, as os.walk does
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.is_file():
+                    # Free on Windows, where scandir already returned the size
+                    total_size += entry.stat().st_size
+                    file_count += 1
+    return total_size, file_count
+
 class Watchdog:
     def __init__(self, components):
         self.components = components
         self.running = False
         self.monitoring_thread = None
-        self.health_checks = []
+        # Set by stop() to wake the monitoring loop immediately
+        self._stop_event = threading.Event()
+        self._interval = MONITOR_INTERVAL
+        self.health_checks = ()
         self.system_stats = {}
         
+        # One handle on our own process, reused on every tick
+        self._process = None
+        if PSUTIL_AVAILABLE:
+            self._process = psutil.Process()
+            # CPU percentages are measured since the previous call, so the
+            # first call only starts the measurement
+            psutil.cpu_percent(interval=None)
+            self._process.cpu_percent(interval=None)
+        self._stats_tick = 0
+        self._open_files_count = 0
+        self._connections_count = 0
+        # Directory name -> (mtime_ns, scanned_at, total_size, file_count)
+        self._dir_cache = {}
+        # Health report built at the end of the last monitoring cycle
+        self._health_report = None
+        # time.time() of the last resource check, formatted only when read
+        self._last_check_wall = None
+        self._last_check_text = (None, None)
+        
         # Initialize health checks
         self.setup_health_checks()
     
     def setup_health_checks(self):
         """Setup system health checks"""
-        self.health_checks = [
+        self.health_checks = (
             self._check_system_resources,
             self._check_component_health,
             self._check_memory_usage,
             self._check_disk_space
-        ]
+        )
     
     def run(self):
         """Start the watchdog monitoring"""
@@ -45,6 +107,8 @@ class Watchdog:
             return
         
         self.running = True
+        self._stop_event.clear()
+        self._interval = MONITOR_INTERVAL
         self.monitoring_thread = threading.Thread(target=self._monitoring_loop, daemon=True)
         self.monitoring_thread.start()
         logger.info("🔄 Watchdog monitoring started")
@@ -52,39 +116,79 @@ class Watchdog:
     def stop(self):
         """Stop the watchdog monitoring"""
         self.running = False
+        self._stop_event.set()
         logger.info("🛑 Watchdog monitoring stopped")
     
     def _monitoring_loop(self):
         """Main monitoring loop"""
-        while self.running:
+        checks = self.health_checks
+        check_pool = ThreadPoolExecutor(max_workers=len(checks),
+                                        thread_name_prefix="wd-check")
+        check_futures = {}
+        
+        while not self._stop_event.is_set():
             try:
-                # Run health checks
-                for check in self.health_checks:
-                    try:
-                        check()
-                    except Exception as e:
-                        logger.error(f"Health check failed: {e}")
+                # Run health checks side by side; a check still running from an
+                # earlier cycle is not started again
+                healthy = True
+                futures = {}
+                for check in checks:
+                    pending = check_futures.get(check)
+                    if pending is None or pending.done():
+                        check_futures[check] = futures[check] = check_pool.submit(check)
+                
+                try:
+                    for future in as_completed(futures.values(), timeout=HEALTH_CHECK_TIMEOUT):
+                        try:
+                            future.result()
+                        except Exception as e:
+                            healthy = False
+                            logger.error(f"Health check failed: {e}")
+                except FuturesTimeoutError:
+                    healthy = False
+                    slow = [check.__name__ for check, future in futures.items() if not future.done()]
+                    logger.warning(f"⚠️ Health checks still running after {HEALTH_CHECK_TIMEOUT}s: {', '.join(slow)}")
                 
                 # Update system stats
                 self._update_system_stats()
                 
-                # Sleep for monitoring interval
-                time.sleep(30)  # Check every 30 seconds
+                # Summarize this cycle once; readers get copies of it
+                self._health_report = self._build_health_report()
+                
+                # Back off while everything is fine, check often once it is not
+                if healthy and self._health_report['health_status'] == 'healthy':
+                    self._interval = min(self._interval * 2, MAX_MONITOR_INTERVAL)
+                else:
+                    self._interval = MONITOR_INTERVAL
+                
+                # Wait for the monitoring interval, or until stop() is called
+                self._stop_event.wait(self._interval)
                 
             except Exception as e:
                 logger.error(f"Watchdog monitoring error: {e}")
-                time.sleep(60)  # Wait longer on error
+                self._stop_event.wait(60)  # Wait longer on error
+        
+        check_pool.shutdown(wait=False)
     
     def _check_system_resources(self):
         """Check system resource usage"""
         try:
+            # Disk usage needs only the standard library
+            disk = shutil.disk_usage('/')
+            # Same figure psutil reports: space reserved for root is not counted
+            disk_percent = round(disk.used / (disk.used + disk.free) * 100, 1)
+            
+            if disk_percent > 90:
+                logger.warning(f"⚠️ Low disk space: {100 - disk_percent}% free")
+            
+            self.system_stats['disk_percent'] = disk_percent
+            
             if not PSUTIL_AVAILABLE:
                 logger.warning("⚠️ psutil not available, skipping system resource check")
                 return
             
-            cpu_percent = psutil.cpu_percent(interval=1)
+            cpu_percent = psutil.cpu_percent(interval=None)
             memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
             
             # Log warnings for high usage
             if cpu_percent > 80:
@@ -93,14 +197,10 @@ class Watchdog:
             if memory.percent > 80:
                 logger.warning(f"⚠️ High memory usage: {memory.percent}%")
             
-            if disk.percent > 90:
-                logger.warning(f"⚠️ Low disk space: {100 - disk.percent}% free")
-            
             # Store stats
             self.system_stats['cpu_percent'] = cpu_percent
             self.system_stats['memory_percent'] = memory.percent
-            self.system_stats['disk_percent'] = disk.percent
-            self.system_stats['last_check'] = datetime.now().isoformat()
+            self._last_check_wall = time.time()
             
         except Exception as e:
             logger.error(f"System resource check failed: {e}")
@@ -109,26 +209,27 @@ class Watchdog:
         """Check component health"""
         try:
             component_status = {}
+            components = self.components
             
             # Check voice pipeline
-            if 'voice' in self.components:
-                voice = self.components['voice']
+            voice = components.get('voice')
+            if voice is not None:
                 component_status['voice'] = {
                     'listening': voice.is_listening,
                     'whisper_loaded': voice.whisper_model is not None
                 }
             
             # Check orchestrator
-            if 'orchestrator' in self.components:
-                orch = self.components['orchestrator']
+            orch = components.get('orchestrator')
+            if orch is not None:
                 component_status['orchestrator'] = {
                     'agents_count': len(orch.agents),
                     'plugins_count': len(orch.plugins)
                 }
             
             # Check memory engine
-            if 'memory' in self.components:
-                memory = self.components['memory']
+            memory = components.get('memory')
+            if memory is not None:
                 stats = memory.get_statistics()
                 component_status['memory'] = {
                     'total_entries': stats.get('total_entries', 0),
@@ -171,23 +272,25 @@ class Watchdog:
             
             for dir_name in output_dirs:
                 try:
-                    import os
-                    if os.path.exists(dir_name):
-                        total_size = 0
-                        file_count = 0
-                        
-                        for root, dirs, files in os.walk(dir_name):
-                            for file in files:
-                                file_path = os.path.join(root, file)
-                                total_size += os.path.getsize(file_path)
-                                file_count += 1
-                        
-                        # Log if directory is getting large
-                        if total_size > 100 * 1024 * 1024:  # 100MB
-                            logger.warning(f"⚠️ Large output directory {dir_name}: {total_size / 1024 / 1024:.1f}MB")
-                        
-                        self.system_stats[f'{dir_name}_size'] = total_size
-                        self.system_stats[f'{dir_name}_files'] = file_count
+                    try:
+                        mtime_ns = os.stat(dir_name).st_mtime_ns
+                    except FileNotFoundError:
+                        continue
+                    
+                    now = time.monotonic()
+                    cached = self._dir_cache.get(dir_name)
+                    if cached and cached[0] == mtime_ns and now - cached[1] < DIR_RESCAN_SECONDS:
+                        total_size, file_count = cached[2], cached[3]
+                    else:
+                        total_size, file_count = _directory_usage(dir_name)
+                        self._dir_cache[dir_name] = (mtime_ns, now, total_size, file_count)
+                    
+                    # Log if directory is getting large
+                    if total_size > 100 * 1024 * 1024:  # 100MB
+                        logger.warning(f"⚠️ Large output directory {dir_name}: {total_size / 1024 / 1024:.1f}MB")
+                    
+                    self.system_stats[f'{dir_name}_size'] = total_size
+                    self.system_stats[f'{dir_name}_files'] = file_count
                         
                 except Exception as e:
                     logger.error(f"Failed to check directory {dir_name}: {e}")
@@ -203,14 +306,26 @@ class Watchdog:
                 return
             
             # Get process info
-            process = psutil.Process()
-            self.system_stats['process'] = {
-                'memory_mb': process.memory_info().rss / 1024 / 1024,
-                'cpu_percent': process.cpu_percent(),
-                'threads': process.num_threads(),
-                'open_files': len(process.open_files()),
-                'connections': len(process.connections())
-            }
+            process = self._process
+            try:
+                # oneshot() reads the per-process /proc data once for all three
+                with process.oneshot():
+                    process_stats = {
+                        'memory_mb': process.memory_info().rss / 1024 / 1024,
+                        'cpu_percent': process.cpu_percent(),
+                        'threads': process.num_threads()
+                    }
+                if self._stats_tick % HEAVY_STATS_EVERY == 0:
+                    self._open_files_count = len(process.open_files())
+                    self._connections_count = len(process.connections())
+                self._stats_tick += 1
+                process_stats['open_files'] = self._open_files_count
+                process_stats['connections'] = self._connections_count
+                self.system_stats['process'] = process_stats
+            except psutil.NoSuchProcess:
+                # The cached handle no longer matches this process (e.g. after a fork)
+                self._process = psutil.Process()
+                raise
             
             # Get network info
             net_io = psutil.net_io_counters()
@@ -226,11 +341,25 @@ class Watchdog:
     
     def get_health_report(self) -> Dict[str, Any]:
         """Get comprehensive health report"""
+        report = self._health_report
+        if report is None:
+            report = self._build_health_report()
+        report = report.copy()
+        report['watchdog_running'] = self.running
+        return report
+    
+    def _build_health_report(self) -> Dict[str, Any]:
+        """Build a health report from the current system stats"""
         try:
+            system_stats = self.system_stats.copy()
+            last_check = self.last_check_iso
+            if last_check:
+                system_stats['last_check'] = last_check
+            
             report = {
                 'timestamp': datetime.now().isoformat(),
                 'watchdog_running': self.running,
-                'system_stats': self.system_stats.copy(),
+                'system_stats': system_stats,
                 'health_status': 'healthy'
             }
             
@@ -238,27 +367,30 @@ class Watchdog:
             issues = []
             
             # Check CPU usage
-            cpu_percent = self.system_stats.get('cpu_percent', 0)
+            cpu_percent = system_stats.get('cpu_percent', 0)
             if cpu_percent > 80:
                 issues.append(f"High CPU usage: {cpu_percent}%")
             
             # Check memory usage
-            memory_percent = self.system_stats.get('memory_percent', 0)
+            memory_percent = system_stats.get('memory_percent', 0)
             if memory_percent > 80:
                 issues.append(f"High memory usage: {memory_percent}%")
             
             # Check disk usage
-            disk_percent = self.system_stats.get('disk_percent', 0)
+            disk_percent = system_stats.get('disk_percent', 0)
             if disk_percent > 90:
                 issues.append(f"Low disk space: {100 - disk_percent}% free")
             
             # Check component health
-            components = self.system_stats.get('components', {})
-            for component, status in components.items():
-                if component == 'voice' and not status.get('whisper_loaded', False):
-                    issues.append("Whisper model not loaded")
-                elif component == 'memory' and status.get('success_rate', 100) < 80:
-                    issues.append(f"Low memory success rate: {status.get('success_rate', 100)}%")
+            components = system_stats.get('components', {})
+            voice_status = components.get('voice')
+            if voice_status is not None and not voice_status.get('whisper_loaded', False):
+                issues.append("Whisper model not loaded")
+            memory_status = components.get('memory')
+            if memory_status is not None:
+                success_rate = memory_status.get('success_rate', 100)
+                if success_rate < 80:
+                    issues.append(f"Low memory success rate: {success_rate}%")
             
             if issues:
                 report['health_status'] = 'warning'
@@ -277,10 +409,22 @@ class Watchdog:
                 'error': str(e)
             }
     
+    @property
+    def last_check_iso(self) -> Optional[str]:
+        """Time of the last resource check as an ISO string, or None"""
+        wall = self._last_check_wall
+        if wall is None:
+            return None
+        cached = self._last_check_text
+        if cached[0] != wall:
+            cached = (wall, datetime.fromtimestamp(wall).isoformat())
+            self._last_check_text = cached
+        return cached[1]
+    
     def get_status(self) -> Dict[str, Any]:
         """Get watchdog status"""
         return {
             'running': self.running,
-            'last_check': self.system_stats.get('last_check', 'never'),
-            'health_status': self.get_health_report()['health_status']
+            'last_check': self.last_check_iso or 'never',
+            'health_status': (self._health_report or self._build_health_report())['health_status']
         } 
\ No newline at end of file
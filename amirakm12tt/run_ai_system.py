@@ -7,8 +7,12 @@ Direct launcher for the AI System without compilation
 import sys
 import os
 import subprocess
+from itertools import islice
 from pathlib import Path
 
+# Most working-directory entries listed when src/main.py is missing
+MAX_LISTED_FILES = 50
+
 def check_python_version():
     """Check if Python version is compatible"""
     if sys.version_info < (3, 8):
@@ -17,11 +21,16 @@ def check_python_version():
         return False
     return True
 
+def install_requested():
+    """Check whether dependency installation was asked for (--install or AI_INSTALL_DEPS=1)"""
+    return "--install" in sys.argv[1:] or os.environ.get("AI_INSTALL_DEPS") == "1"
+
 def install_dependencies():
     """Install required dependencies"""
     print("🔧 Installing dependencies...")
     try:
-        subprocess.run([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"], 
+        subprocess.run([sys.executable, "-m", "pip", "install", "--disable-pip-version-check",
+                        "--no-input", "-r", "requirements.txt"],
                       check=True, capture_output=True)
         print("✅ Dependencies installed successfully")
         return True
@@ -44,7 +53,9 @@ def run_ai_system():
         
     except ImportError as e:
         print(f"❌ Import error: {e}")
-        print("🔧 Trying to install missing dependencies...")
+        if not install_requested():
+            print("💡 Run with --install (or set AI_INSTALL_DEPS=1) to install missing dependencies")
+            return
         if install_dependencies():
             print("🔄 Retrying...")
             try:
@@ -78,8 +89,9 @@ def main():
     if not main_file.exists():
         print("❌ Could not find src/main.py")
         print("📁 Available files:")
-        for item in Path.cwd().iterdir():
-            print(f"  • {item.name}")
+        with os.scandir() as entries:
+            for entry in islice(entries, MAX_LISTED_FILES):
+                print(f"  • {entry.name}")
         return
     
     print("✅ Found main.py")